@@ -5,16 +5,21 @@ Main entry point using SOLID architecture
 import discord
 from discord.ext import commands, tasks
 from discord import app_commands
+import asyncio
+import bisect
 import os
-import threading
-from flask import Flask
+import time
+import traceback
+from aiohttp import web
 
 # Import our modular components
 from src.database.setup import db_setup
 from src.database.connection import db_manager
+from src.database.models import User, Settings
 from src.card_game.card_library import CardLibrary
 from src.card_game.card_manager import card_manager
 from src.card_game.pack_system import pack_system
+from src.card_game.daily_rewards import daily_rewards
 from src.card_game.abilities import ability_system
 from src.card_game.battle_system import battle_manager
 from src.card_game.battle_ui import CardSelectionView, BattleView, ChallengeView
@@ -22,14 +27,68 @@ from src.card_game.battle_ui import CardSelectionView, BattleView, ChallengeView
 # Bot setup
 intents = discord.Intents.default()
 intents.message_content = True
-bot = commands.Bot(command_prefix='!', intents=intents, help_command=None)
+class VibeBot(commands.Bot):
+    health_runner = None  # aiohttp runner for the health check server, once started
+    
+    async def setup_hook(self):
+        """Start the health check server once, before connecting to the gateway"""
+        app = web.Application()
+        app.router.add_get('/', home)
+        app.router.add_get('/health', health)
+        
+        runner = web.AppRunner(app)
+        await runner.setup()
+        port = int(os.environ.get('PORT', 10000))
+        try:
+            await web.TCPSite(runner, '0.0.0.0', port).start()
+            self.health_runner = runner
+            print(f"[MAIN] Health server listening on port {port}")
+        except OSError as e:
+            # Health checks are optional; the bot still connects without them
+            print(f"[MAIN] ❌ Health server failed to start on port {port}: {e}")
+            await runner.cleanup()
+    
+    async def close(self):
+        """Stop the XP flush loop, writing what is pending, before disconnecting"""
+        if flush_xp.is_running():
+            task = flush_xp.get_task()
+            flush_xp.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        if self.health_runner is not None:
+            await self.health_runner.cleanup()
+            self.health_runner = None
+        await super().close()
+
+bot = VibeBot(command_prefix='!', intents=intents, help_command=None)
 
 # Initialize components
 card_library = CardLibrary()
 
 # Configuration functions
+_config_cache = {}  # key -> value, loaded once after database initialization
+_config_loaded = False  # set once the whole table has been cached
+
+def load_config_cache():
+    """Load the whole config table into memory"""
+    global _config_loaded
+    try:
+        rows = db_manager.fetch_all('SELECT key, value FROM config')
+        _config_cache.clear()
+        _config_cache.update(rows)
+        _config_loaded = True
+        print(f"[CONFIG] Cached {len(_config_cache)} configuration value(s)")
+    except Exception as e:
+        print(f"Error loading config cache: {e}")
+    # Without a full cache these fall back to reading the database
+    load_settings()
+    load_level_params()
+
 def get_config(key):
     """Get configuration value"""
+    # Until a full load succeeds the cache may only hold keys set since startup
+    if _config_loaded or key in _config_cache:
+        return _config_cache.get(key)
+    
     try:
         result = db_manager.fetch_one('SELECT value FROM config WHERE key = ?', (key,))
         return result[0] if result else None
@@ -39,69 +98,274 @@ def get_config(key):
 
 def set_config(key, value):
     """Set configuration value"""
+    try:
+        validate_config_value(key, value)
+    except ValueError as e:
+        print(f"Invalid value for config {key}: {e}")
+        return False
+    
     try:
         if db_manager.db_type == 'postgresql':
             db_manager.execute_query('INSERT INTO config (key, value) VALUES (%s, %s) ON CONFLICT (key) DO UPDATE SET value = EXCLUDED.value', (key, value))
         else:
             db_manager.execute_query('INSERT OR REPLACE INTO config (key, value) VALUES (?, ?)', (key, value))
+        _config_cache[key] = value
+        if key in ('level_multiplier', 'level_scaling_factor'):
+            load_level_params()
+        if key in SETTING_KEYS:
+            load_settings()
         return True
     except Exception as e:
         print(f"Error setting config {key}: {e}")
         return False
 
+# Parsed settings used on every message and command, refreshed when their keys change
+SETTING_KEYS = ('game_enabled', 'xp_cooldown', 'xp_per_message', 'xp_channel', 'level_up_message')
+settings = Settings()
+
+def load_settings():
+    """Parse the hot-path settings out of the config cache"""
+    global settings
+    try:
+        xp_channel = get_config('xp_channel')
+        settings = Settings(
+            game_enabled=get_config('game_enabled') == 'True',
+            xp_cooldown=int(get_config('xp_cooldown') or '60'),
+            xp_per_message=int(get_config('xp_per_message') or '15'),
+            xp_channel_id=int(xp_channel) if xp_channel and xp_channel != 'None' else None,
+            level_up_message=get_config('level_up_message') or Settings.level_up_message
+        )
+    except ValueError as e:
+        print(f"Invalid setting, keeping previous values: {e}")
+
 # User management functions
-def get_user_data(user_id):
-    """Get user data with automatic creation"""
+def get_user_data(user_id, create=True):
+    """Get user data, creating the row unless create is False"""
     try:
-        result = db_manager.fetch_one('SELECT * FROM users WHERE user_id = ?', (user_id,))
+        result = db_manager.fetch_one('''SELECT xp, level, last_message, total_messages, username, display_name
+                                        FROM users WHERE user_id = ?''', (user_id,))
         if not result:
-            db_manager.execute_query('INSERT INTO users (user_id) VALUES (?)', (user_id,))
-            result = (user_id, 0, 1, None, 0, None, None)
-        return result
+            if create:
+                db_manager.execute_query('INSERT INTO users (user_id) VALUES (?)', (user_id,))
+            return User(user_id)
+        return User(user_id, *result)
     except Exception as e:
         print(f"Error getting user data: {e}")
-        return (user_id, 0, 1, None, 0, None, None)
+        return User(user_id)
 
-def calculate_level_from_xp(total_xp):
-    """Calculate level based on progressive XP requirements"""
-    base_xp = int(get_config('level_multiplier') or '100')
-    scaling_factor = float(get_config('level_scaling_factor') or '1.2')
-    level = 1
+def get_user_count():
+    """Number of users without scanning the users table"""
+    if db_manager.db_type == 'postgresql':
+        # Planner estimate; -1 (0 before PostgreSQL 14) until the table has been analyzed
+        result = db_manager.fetch_one("SELECT reltuples::BIGINT FROM pg_class WHERE oid = 'public.users'::regclass")
+        if result and result[0] > 0:
+            return result[0]
+        result = db_manager.fetch_one('SELECT COUNT(*) FROM users')
+    else:
+        result = db_manager.fetch_one("SELECT value FROM stats WHERE name = 'users'")
+    return result[0] if result else 0
+
+# Level curve
+MAX_LEVEL = 500
+_LEVEL_PARAMS = (100, 1.2)  # (base_xp, scaling_factor) from the level config
+LEVEL_THRESHOLDS = []  # LEVEL_THRESHOLDS[i] is the total XP needed to reach level i + 2
+
+def level_xp_requirement(level, base_xp, scaling_factor):
+    """XP needed to advance from level to level + 1"""
+    return int(base_xp * level * (scaling_factor ** (level - 1)))
+
+def build_level_thresholds(base_xp, scaling_factor):
+    """Precompute cumulative XP thresholds for the given curve"""
+    thresholds = []
     xp_needed = 0
-    
-    while total_xp >= xp_needed:
-        level_xp_requirement = int(base_xp * level * (scaling_factor ** (level - 1)))
-        xp_needed += level_xp_requirement
-        
-        if total_xp >= xp_needed:
-            level += 1
-        else:
+    for level in range(1, MAX_LEVEL):
+        try:
+            xp_needed += level_xp_requirement(level, base_xp, scaling_factor)
+        except OverflowError:
             break
+        thresholds.append(xp_needed)
     
-    return level
+    LEVEL_THRESHOLDS[:] = thresholds
+
+def parse_level_params(multiplier, scaling_factor):
+    """Parse the level curve config, raising ValueError for unusable values"""
+    base_xp = int(multiplier or '100')
+    scaling = float(scaling_factor or '1.2')
+    if base_xp <= 0 or not 0 < scaling < float('inf'):
+        raise ValueError(f"unusable level curve ({multiplier!r}, {scaling_factor!r})")
+    return base_xp, scaling
 
-def update_user_xp(user_id, xp_gain, username=None, display_name=None):
-    """Update user XP and level"""
+def load_level_params():
+    """Read the level config once and rebuild the threshold table"""
+    global _LEVEL_PARAMS
     try:
-        user_data = get_user_data(user_id)
-        current_xp = user_data[1]
-        current_level = user_data[2]
-        total_messages = user_data[4]
-        
-        new_xp = current_xp + xp_gain
-        new_level = calculate_level_from_xp(new_xp)
-        
-        from datetime import datetime
-        now_str = datetime.now().isoformat()
-        
-        db_manager.execute_query('''UPDATE users SET xp = ?, level = ?, last_message = ?, total_messages = ?, 
-                                   username = ?, display_name = ? WHERE user_id = ?''', 
-                               (new_xp, new_level, now_str, total_messages + 1, username, display_name, user_id))
+        _LEVEL_PARAMS = parse_level_params(get_config('level_multiplier'), get_config('level_scaling_factor'))
+    except ValueError as e:
+        print(f"Invalid level setting, keeping previous curve: {e}")
+    build_level_thresholds(*_LEVEL_PARAMS)
+
+def validate_config_value(key, value):
+    """Raise ValueError if a key that is parsed on load would get an unusable value"""
+    if key == 'level_multiplier':
+        parse_level_params(value, None)
+    elif key == 'level_scaling_factor':
+        parse_level_params(None, value)
+    elif key in ('xp_cooldown', 'xp_per_message'):
+        int(value or '0')
+    elif key == 'xp_channel' and value and value != 'None':
+        int(value)
+
+def calculate_level_from_xp(total_xp):
+    """Calculate level based on progressive XP requirements"""
+    if not LEVEL_THRESHOLDS:
+        load_level_params()
+    return bisect.bisect_right(LEVEL_THRESHOLDS, total_xp) + 1
+
+def calculate_xp_for_level(level):
+    """Total XP needed to reach a level (levels past the table are capped)"""
+    if level <= 1:
+        return 0
+    if not LEVEL_THRESHOLDS:
+        load_level_params()
+    return LEVEL_THRESHOLDS[min(level, len(LEVEL_THRESHOLDS) + 1) - 2]
+
+def update_user_xp(user_id, xp_gain, username=None, display_name=None, now=None):
+    """Update user XP and level, returning (level_up, new_level, new_xp)"""
+    try:
+        now = int(now if now is not None else time.time())
+        
+        # Create-or-increment in one statement; the new total comes back with it
+        with db_manager.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(db_manager.convert_query('''INSERT INTO users (user_id, xp, total_messages, last_message, username, display_name)
+                                                     VALUES (?, ?, 1, ?, ?, ?)
+                                                     ON CONFLICT (user_id) DO UPDATE SET
+                                                         xp = users.xp + excluded.xp,
+                                                         total_messages = users.total_messages + 1,
+                                                         last_message = excluded.last_message,
+                                                         username = COALESCE(excluded.username, users.username),
+                                                         display_name = COALESCE(excluded.display_name, users.display_name)
+                                                     RETURNING xp'''),
+                           (user_id, xp_gain, now, username, display_name))
+            new_xp = cursor.fetchone()[0]
+            
+            current_level = calculate_level_from_xp(new_xp - xp_gain)
+            new_level = calculate_level_from_xp(new_xp)
+            cursor.execute(db_manager.convert_query('UPDATE users SET level = ? WHERE user_id = ?'), (new_level, user_id))
         
-        return new_level > current_level, new_level
+        return new_level > current_level, new_level, new_xp
     except Exception as e:
         print(f"Error updating user XP: {e}")
-        return False, 1  # Return default level on error
+        return False, 1, None  # Return default level on error
+
+# Message XP is accumulated in memory and written in one batch by flush_xp.
+# Everything touching these dicts runs on the event loop without awaiting in
+# between, so no lock is needed and database calls never hold up other messages.
+_pending_xp = {}          # user_id -> XP gained since the last flush
+_pending_msg_count = {}   # user_id -> messages awarded since the last flush
+_pending_names = {}       # user_id -> (username, display_name, last_message)
+_xp_cache = {}            # user_id -> current total XP, kept while writes are pending
+
+async def queue_user_xp(user_id, xp_gain, username=None, display_name=None, now=None):
+    """Record message XP for the next flush and return (level_up, new_level)"""
+    if user_id not in _xp_cache:
+        # No row yet is fine: the flush creates it
+        stored_xp = (await asyncio.to_thread(get_user_data, user_id, False)).xp
+        # Another message may have seeded the cache while we were reading
+        _xp_cache.setdefault(user_id, stored_xp)
+    
+    current_xp = _xp_cache[user_id]
+    new_xp = current_xp + xp_gain
+    current_level = calculate_level_from_xp(current_xp)
+    new_level = calculate_level_from_xp(new_xp)
+    
+    _xp_cache[user_id] = new_xp
+    _pending_xp[user_id] = _pending_xp.get(user_id, 0) + xp_gain
+    _pending_msg_count[user_id] = _pending_msg_count.get(user_id, 0) + 1
+    _pending_names[user_id] = (username, display_name, int(now if now is not None else time.time()))
+    
+    return new_level > current_level, new_level
+
+# user_id -> time of the last XP award, so cooldown checks skip the database
+_last_msg_ts = {}
+
+def write_xp_batch(rows):
+    """Apply XP deltas and set each level from the stored total; returns [(user_id, xp)]"""
+    totals = []
+    with db_manager.connection() as conn:
+        cursor = conn.cursor()
+        cursor.executemany(db_manager.convert_query('''INSERT INTO users (user_id, xp, total_messages, last_message, username, display_name)
+                                                      VALUES (?, ?, ?, ?, ?, ?)
+                                                      ON CONFLICT (user_id) DO UPDATE SET
+                                                          xp = users.xp + excluded.xp,
+                                                          total_messages = users.total_messages + excluded.total_messages,
+                                                          last_message = excluded.last_message,
+                                                          username = excluded.username,
+                                                          display_name = excluded.display_name'''), rows)
+        
+        # Levels follow the stored totals, which include XP written elsewhere
+        user_ids = [row[0] for row in rows]
+        for i in range(0, len(user_ids), 500):
+            chunk = user_ids[i:i + 500]
+            placeholders = ', '.join('?' for _ in chunk)
+            cursor.execute(db_manager.convert_query(f'SELECT user_id, xp FROM users WHERE user_id IN ({placeholders})'), chunk)
+            totals.extend(cursor.fetchall())
+        
+        cursor.executemany(db_manager.convert_query('UPDATE users SET level = ? WHERE user_id = ?'),
+                           [(calculate_level_from_xp(xp), user_id) for user_id, xp in totals])
+    return totals
+
+async def write_pending_xp():
+    """Write all pending message XP in a single transaction"""
+    if not _pending_xp:
+        return
+    
+    # Take the pending batch; awards arriving during the write start a new one
+    rows = []
+    for user_id, xp_gain in _pending_xp.items():
+        username, display_name, last_message = _pending_names[user_id]
+        rows.append((user_id, xp_gain, _pending_msg_count[user_id], last_message, username, display_name))
+    
+    _pending_xp.clear()
+    _pending_msg_count.clear()
+    _pending_names.clear()
+    
+    try:
+        totals = await asyncio.to_thread(write_xp_batch, rows)
+    except Exception as e:
+        print(f"Error flushing XP: {e}")
+        # Keep the deltas so the next flush retries them
+        for user_id, xp_gain, message_count, last_message, username, display_name in rows:
+            _pending_xp[user_id] = _pending_xp.get(user_id, 0) + xp_gain
+            _pending_msg_count[user_id] = _pending_msg_count.get(user_id, 0) + message_count
+            _pending_names.setdefault(user_id, (username, display_name, last_message))
+        return
+    
+    # Re-base users with newer awards on the stored total; the rest are re-read next time
+    for user_id, xp in totals:
+        if user_id in _pending_xp:
+            _xp_cache[user_id] = xp + _pending_xp[user_id]
+        else:
+            _xp_cache.pop(user_id, None)
+
+async def award_user_xp(user_id, xp_gain, username=None, display_name=None):
+    """Write non-message XP right away and return (level_up, new_level)"""
+    level_up, new_level, new_xp = await asyncio.to_thread(update_user_xp, user_id, xp_gain, username, display_name)
+    # Back on the event loop; a flush may have re-based the cache during the write,
+    # so keep whichever total is higher rather than adding on top of it
+    if new_xp is not None and user_id in _xp_cache:
+        _xp_cache[user_id] = max(_xp_cache[user_id], new_xp + _pending_xp.get(user_id, 0))
+    return level_up, new_level
+
+@tasks.loop(seconds=5)
+async def flush_xp():
+    """Periodically write pending message XP"""
+    await write_pending_xp()
+
+@flush_xp.after_loop
+async def flush_remaining_xp():
+    """Write whatever XP is still pending when the loop stops"""
+    await write_pending_xp()
 
 # Bot Events
 @bot.event
@@ -116,6 +380,11 @@ async def on_ready():
     except Exception as e:
         print(f"[BOT_STARTUP] Database initialization failed: {e}")
     
+    load_config_cache()
+    
+    if not flush_xp.is_running():
+        flush_xp.start()
+    
     # Sync slash commands
     try:
         print("[BOT_STARTUP] 🔄 Syncing slash commands...")
@@ -135,34 +404,31 @@ async def on_message(message):
         return
     
     # XP System
-    user_data = get_user_data(message.author.id)
-    last_message = user_data[3]
-    cooldown = int(get_config('xp_cooldown') or '60')
+    now = time.time()
     
-    if last_message:
-        try:
-            from datetime import datetime, timedelta
-            last_time = datetime.fromisoformat(last_message)
-            if datetime.now() - last_time < timedelta(seconds=cooldown):
-                await bot.process_commands(message)
-                return
-        except (ValueError, TypeError):
-            pass
+    last_award = _last_msg_ts.get(message.author.id)
+    if last_award is None:
+        # First message since startup: fall back to the stored timestamp
+        last_message = (await asyncio.to_thread(get_user_data, message.author.id, False)).last_message
+        last_award = _last_msg_ts.setdefault(message.author.id, last_message or 0)
+    
+    if now - last_award < settings.xp_cooldown:
+        await bot.process_commands(message)
+        return
+    
+    _last_msg_ts[message.author.id] = now
     
     # Award XP
-    xp_gain = int(get_config('xp_per_message') or '15')
     username = message.author.name
     display_name = message.author.display_name
     
-    level_up, new_level = update_user_xp(message.author.id, xp_gain, username, display_name)
+    level_up, new_level = await queue_user_xp(message.author.id, settings.xp_per_message, username, display_name, now)
     
     if level_up:
-        level_up_msg = get_config('level_up_message') or 'Congratulations {user}! You reached level {level}!'
-        formatted_msg = level_up_msg.format(user=message.author.mention, level=new_level)
+        formatted_msg = settings.level_up_message.format(user=message.author.mention, level=new_level)
         
-        xp_channel = get_config('xp_channel')
-        if xp_channel and xp_channel != 'None':
-            channel = bot.get_channel(int(xp_channel))
+        if settings.xp_channel_id is not None:
+            channel = bot.get_channel(settings.xp_channel_id)
             if channel and hasattr(channel, 'send'):
                 await channel.send(formatted_msg)
         else:
@@ -174,16 +440,16 @@ async def on_message(message):
 @bot.tree.command(name='pack', description='Open a card pack using pack tokens')
 async def pack_slash(interaction: discord.Interaction):
     """Open a card pack using pack tokens"""
-    if get_config('game_enabled') != 'True':
+    if not settings.game_enabled:
         await interaction.response.send_message("The card game is currently disabled.", ephemeral=True)
         return
     
     # Use the modular pack system
-    pack_cards = pack_system.open_pack(interaction.user.id)
+    pack_cards = await asyncio.to_thread(pack_system.open_pack, interaction.user.id)
     
     if pack_cards is None:
         # No tokens available
-        user_tokens = pack_system.get_user_pack_tokens(interaction.user.id)
+        user_tokens = await asyncio.to_thread(pack_system.get_user_pack_tokens, interaction.user.id)
         token_count = user_tokens.get('standard', 0)
         
         embed = discord.Embed(
@@ -200,7 +466,7 @@ async def pack_slash(interaction: discord.Interaction):
         return
     
     # Get remaining tokens
-    remaining_tokens = pack_system.get_user_pack_tokens(interaction.user.id).get('standard', 0)
+    remaining_tokens = (await asyncio.to_thread(pack_system.get_user_pack_tokens, interaction.user.id)).get('standard', 0)
     
     # Display the pack opening
     embed = discord.Embed(
@@ -343,12 +609,12 @@ class CardCollectionView(discord.ui.View):
 @bot.tree.command(name='cards', description='View your card collection with navigation')
 async def cards_slash(interaction: discord.Interaction):
     """View your card collection with navigation buttons"""
-    if get_config('game_enabled') != 'True':
+    if not settings.game_enabled:
         await interaction.response.send_message("The card game is currently disabled.", ephemeral=True)
         return
     
     # Use the modular card manager
-    collection = card_manager.get_user_collection(interaction.user.id)
+    collection = await asyncio.to_thread(card_manager.get_user_collection, interaction.user.id)
     
     if not collection:
         embed = discord.Embed(
@@ -365,7 +631,7 @@ async def cards_slash(interaction: discord.Interaction):
         return
     
     # Get collection stats using modular system
-    stats = card_manager.get_collection_stats(interaction.user.id)
+    stats = await asyncio.to_thread(card_manager.get_collection_stats, interaction.user.id)
     
     # Create the view with navigation buttons
     view = CardCollectionView(interaction.user.id, collection, stats)
@@ -376,14 +642,11 @@ async def cards_slash(interaction: discord.Interaction):
 @bot.tree.command(name='daily', description='Claim your daily pack tokens')
 async def daily_slash(interaction: discord.Interaction):
     """Claim daily pack tokens"""
-    if get_config('game_enabled') != 'True':
+    if not settings.game_enabled:
         await interaction.response.send_message("The card game is currently disabled.", ephemeral=True)
         return
     
-    from src.card_game.daily_rewards import DailyRewards
-    daily_system = DailyRewards()
-    
-    reward_result = daily_system.claim_daily_reward(interaction.user.id)
+    reward_result = await asyncio.to_thread(daily_rewards.claim_daily_reward, interaction.user.id)
     
     if not reward_result:
         await interaction.response.send_message("❌ Something went wrong with your daily reward. Please try again.", ephemeral=True)
@@ -433,13 +696,13 @@ async def daily_slash(interaction: discord.Interaction):
 @app_commands.describe(card_name='Name of the card to view')
 async def view_slash(interaction: discord.Interaction, card_name: str):
     """View a specific card with full details and ASCII art"""
-    if get_config('game_enabled') != 'True':
+    if not settings.game_enabled:
         await interaction.response.send_message("The card game is currently disabled.", ephemeral=True)
         return
     
     try:
         # Search for the card in the user's collection
-        user_collection = card_manager.get_user_collection(interaction.user.id)
+        user_collection = await asyncio.to_thread(card_manager.get_user_collection, interaction.user.id)
         
         # Find the card (case-insensitive search)
         found_card = None
@@ -451,12 +714,7 @@ async def view_slash(interaction: discord.Interaction, card_name: str):
         
         if not found_card:
             # Check if the card exists in the library but user doesn't own it
-            all_cards = card_library.get_all_cards()
-            library_card = None
-            for card in all_cards:
-                if card['name'].lower() == card_name.lower():
-                    library_card = card
-                    break
+            library_card = card_library.get_card_by_name(card_name)
             
             if library_card:
                 embed = discord.Embed(
@@ -529,15 +787,20 @@ async def view_slash(interaction: discord.Interaction, card_name: str):
 async def level_slash(interaction: discord.Interaction, user: discord.Member | None = None):
     """Check your level or another user's level"""
     target = user if user is not None else interaction.user
-    user_data = get_user_data(target.id)
+    user_data = await asyncio.to_thread(get_user_data, target.id)
     
-    current_level = user_data[2]
-    current_xp = user_data[1]
+    current_level = user_data.level
+    current_xp = user_data.xp
+    
+    # Include XP that is still waiting for the next flush
+    if target.id in _xp_cache:
+        current_xp = _xp_cache[target.id]
+        current_level = calculate_level_from_xp(current_xp)
     
     embed = discord.Embed(title=f"{target.display_name}'s Level", color=0x3498db)
     embed.add_field(name="Level", value=current_level, inline=True)
     embed.add_field(name="Total XP", value=f"{current_xp:,}", inline=True)
-    embed.add_field(name="Messages", value=user_data[4], inline=True)
+    embed.add_field(name="Messages", value=user_data.total_messages, inline=True)
     
     await interaction.response.send_message(embed=embed)
 
@@ -547,33 +810,31 @@ async def xp_table_slash(interaction: discord.Interaction, start_level: int = 1,
     """View XP requirements for each level"""
     try:
         # Validate inputs
-        start_level = max(1, start_level)
         levels = max(1, min(levels, 50))  # Limit to 50 levels max
         
-        base_xp = int(get_config('level_multiplier') or '100')
-        scaling_factor = float(get_config('level_scaling_factor') or '1.2')
+        if not LEVEL_THRESHOLDS:
+            load_level_params()
+        base_xp, scaling_factor = _LEVEL_PARAMS
+        
+        # Stay inside the precomputed table
+        max_table_level = len(LEVEL_THRESHOLDS)
+        start_level = max(1, min(start_level, max_table_level - levels + 1))
+        end_level = min(start_level + levels - 1, max_table_level)
         
         embed = discord.Embed(
             title="📊 XP Level Requirements",
-            description=f"XP needed for levels {start_level} to {start_level + levels - 1}",
+            description=f"XP needed for levels {start_level} to {end_level}",
             color=0x3498db
         )
         
-        # Calculate XP requirements
-        xp_table_text = ""
-        total_xp = 0
-        
-        # Calculate total XP up to start_level - 1
-        for level in range(1, start_level):
-            level_xp_requirement = int(base_xp * level * (scaling_factor ** (level - 1)))
-            total_xp += level_xp_requirement
-        
-        # Display the requested levels
-        for level in range(start_level, start_level + levels):
-            level_xp_requirement = int(base_xp * level * (scaling_factor ** (level - 1)))
-            total_xp += level_xp_requirement
+        # Read requirements off the cumulative thresholds
+        table_lines = []
+        for level in range(start_level, end_level + 1):
+            total_xp = calculate_xp_for_level(level + 1)
+            requirement = total_xp - calculate_xp_for_level(level)
             
-            xp_table_text += f"**Level {level}:** {level_xp_requirement:,} XP (Total: {total_xp:,})\n"
+            table_lines.append(f"**Level {level}:** {requirement:,} XP (Total: {total_xp:,})")
+        xp_table_text = "\n".join(table_lines)
         
         embed.add_field(
             name="Level Requirements",
@@ -601,11 +862,80 @@ async def xp_table_slash(interaction: discord.Interaction, start_level: int = 1,
         print(f"XP table error: {e}")
         await interaction.response.send_message("❌ Error displaying XP table. Please try again.", ephemeral=True)
 
+# Names fetched from Discord for users missing from the client cache, per guild
+NAME_CACHE_TTL = 3600  # seconds
+NAME_CACHE_SIZE = 1024
+_name_cache = {}  # (guild_id, user_id) -> (name, fetched_at)
+
+def get_cached_name(guild_id, user_id):
+    """Return a fetched display name if it is still fresh"""
+    entry = _name_cache.get((guild_id, user_id))
+    if entry and time.time() - entry[1] < NAME_CACHE_TTL:
+        return entry[0]
+    return None
+
+def cache_name(guild_id, user_id, name):
+    """Remember a fetched display name, evicting the oldest entry when full"""
+    key = (guild_id, user_id)
+    _name_cache.pop(key, None)
+    if len(_name_cache) >= NAME_CACHE_SIZE:
+        _name_cache.pop(next(iter(_name_cache)))
+    _name_cache[key] = (name, time.time())
+
+async def fetch_missing_names(user_ids, guild=None, timeout=2.0):
+    """Fetch names for users we cannot name locally, batched per guild"""
+    guild_id = guild.id if guild else None
+    missing = [user_id for user_id in user_ids if get_cached_name(guild_id, user_id) is None]
+    if not missing:
+        return
+    
+    # Stay well inside the interaction response window
+    deadline = time.monotonic() + timeout
+    
+    if guild is not None:
+        # One gateway request resolves up to 100 members
+        try:
+            members = await asyncio.wait_for(
+                guild.query_members(user_ids=missing[:100], limit=min(len(missing), 100)),
+                timeout
+            )
+        except (asyncio.TimeoutError, discord.ClientException) as e:
+            print(f"Could not query {len(missing)} guild member(s): {e}")
+            members = []
+        
+        for member in members:
+            cache_name(guild_id, member.id, member.display_name)
+        
+        # Whoever is left has probably left the guild
+        missing = [user_id for user_id in missing if get_cached_name(guild_id, user_id) is None]
+        if not missing:
+            return
+    
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        return
+    
+    try:
+        results = await asyncio.wait_for(
+            asyncio.gather(*(bot.fetch_user(user_id) for user_id in missing), return_exceptions=True),
+            remaining
+        )
+    except asyncio.TimeoutError:
+        print(f"Timed out fetching {len(missing)} user name(s)")
+        return
+    
+    for user_id, result in zip(missing, results):
+        if isinstance(result, Exception):
+            print(f"Could not fetch user {user_id}: {result}")
+        else:
+            cache_name(guild_id, user_id, result.display_name)
+
 # Leaderboard View with Navigation Buttons
 class LeaderboardView(discord.ui.View):
-    def __init__(self, top_users: list):
+    def __init__(self, top_users: list, guild_id=None):
         super().__init__(timeout=300)  # 5 minute timeout
         self.top_users = top_users
+        self.guild_id = guild_id
         self.current_page = 1
         self.users_per_page = 10
         self.total_pages = (len(top_users) + self.users_per_page - 1) // self.users_per_page
@@ -631,7 +961,7 @@ class LeaderboardView(discord.ui.View):
             color=0xffd700
         )
         
-        leaderboard_text = ""
+        entries = []
         for i, user_data in enumerate(page_users, start=start_idx + 1):
             user_id, xp, level, username, display_name, total_messages = user_data
             
@@ -645,7 +975,7 @@ class LeaderboardView(discord.ui.View):
                 elif username:
                     user_name = username
                 else:
-                    user_name = f"User {user_id}"
+                    user_name = get_cached_name(self.guild_id, user_id) or f"User {user_id}"
             except:
                 user_name = display_name or username or f"User {user_id}"
             
@@ -659,12 +989,12 @@ class LeaderboardView(discord.ui.View):
             else:
                 medal = f"**{i}.**"
             
-            leaderboard_text += f"{medal} **{user_name}**\n"
-            leaderboard_text += f"    📊 Level {level} • {xp:,} XP • {total_messages} messages\n\n"
+            entries.append(f"{medal} **{user_name}**\n"
+                           f"    📊 Level {level} • {xp:,} XP • {total_messages} messages")
         
         embed.add_field(
             name="Rankings",
-            value=leaderboard_text,
+            value="\n\n".join(entries),
             inline=False
         )
         
@@ -713,8 +1043,11 @@ class LeaderboardView(discord.ui.View):
 async def leaderboard_slash(interaction: discord.Interaction):
     """View the XP leaderboard with navigation buttons"""
     try:
+        # Name lookups below can take a while; acknowledge the interaction first
+        await interaction.response.defer()
+        
         # Get top users by XP
-        top_users = db_manager.fetch_all('''SELECT user_id, xp, level, username, display_name, total_messages 
+        top_users = await asyncio.to_thread(db_manager.fetch_all, '''SELECT user_id, xp, level, username, display_name, total_messages 
                                            FROM users 
                                            WHERE xp > 0 
                                            ORDER BY xp DESC 
@@ -726,79 +1059,95 @@ async def leaderboard_slash(interaction: discord.Interaction):
                 description="No users found with XP yet! Start chatting to gain XP!",
                 color=0x95a5a6
             )
-            await interaction.response.send_message(embed=embed)
+            await interaction.followup.send(embed=embed)
             return
         
+        # Resolve users with no name in the client cache or the database
+        await fetch_missing_names([user_id for user_id, _, _, username, display_name, _ in top_users
+                                   if not (display_name or username or bot.get_user(user_id))],
+                                  interaction.guild)
+        
         # Create the view with navigation buttons
-        view = LeaderboardView(top_users)
+        view = LeaderboardView(top_users, interaction.guild_id)
         embed = view.create_embed()
         
-        await interaction.response.send_message(embed=embed, view=view)
+        await interaction.followup.send(embed=embed, view=view)
         
     except Exception as e:
         print(f"Leaderboard error: {e}")
-        await interaction.response.send_message("❌ Error loading leaderboard. Please try again.", ephemeral=True)
+        if not interaction.response.is_done():
+            await interaction.response.send_message("❌ Error loading leaderboard. Please try again.", ephemeral=True)
+        else:
+            await interaction.followup.send("❌ Error loading leaderboard. Please try again.", ephemeral=True)
 
-@bot.tree.command(name='help', description='Show all available commands')
-async def help_slash(interaction: discord.Interaction):
-    """Show all available commands"""
-    try:
-        embed = discord.Embed(
-            title="🤖 VibeBot Commands v1.2.29", 
-            description="Your modular Discord bot with card games and interactive battles!",
-            color=0x00d4ff
-        )
-        
-        # User Commands
-        embed.add_field(
-            name="🃏 Card Game Commands", 
-            value="🔹 `/pack` - Open card packs using tokens\n🔹 `/cards` - View your collection with navigation\n🔹 `/view <card_name>` - View a specific card with ASCII art\n🔹 `/daily` - Claim daily pack tokens",
-            inline=False
-        )
-        
-        embed.add_field(
-            name="⚔️ Battle System Commands", 
-            value="🔹 `/challenge @user` - Challenge another player to battle\n🔹 `/battle_select` - Interactive card selection for battles\n🔹 `/battle_attack` - Attack during your turn (or use buttons!)\n🔹 `/battle_status` - View detailed battle information\n🔹 `/battle_forfeit` - Surrender your current battle",
-            inline=False
-        )
-        
+def build_help_embed(is_staff):
+    """Build the static help embed, including staff commands if requested"""
+    embed = discord.Embed(
+        title="🤖 VibeBot Commands v1.2.29", 
+        description="Your modular Discord bot with card games and interactive battles!",
+        color=0x00d4ff
+    )
+    
+    # User Commands
+    embed.add_field(
+        name="🃏 Card Game Commands", 
+        value="🔹 `/pack` - Open card packs using tokens\n🔹 `/cards` - View your collection with navigation\n🔹 `/view <card_name>` - View a specific card with ASCII art\n🔹 `/daily` - Claim daily pack tokens",
+        inline=False
+    )
+    
+    embed.add_field(
+        name="⚔️ Battle System Commands", 
+        value="🔹 `/challenge @user` - Challenge another player to battle\n🔹 `/battle_select` - Interactive card selection for battles\n🔹 `/battle_attack` - Attack during your turn (or use buttons!)\n🔹 `/battle_status` - View detailed battle information\n🔹 `/battle_forfeit` - Surrender your current battle",
+        inline=False
+    )
+    
+    embed.add_field(
+        name="📊 XP System Commands", 
+        value="🔹 `/level [user]` - Check your or another user's level\n🔹 `/leaderboard` - View the XP leaderboard with navigation\n🔹 `/xp_table [start] [levels]` - View XP requirements for levels\n🔹 💬 Chat to gain XP automatically!",
+        inline=False
+    )
+    
+    embed.add_field(
+        name="ℹ️ Information Commands", 
+        value="🔹 `/help` - Show this help menu",
+        inline=False
+    )
+    
+    if is_staff:
         embed.add_field(
-            name="📊 XP System Commands", 
-            value="🔹 `/level [user]` - Check your or another user's level\n🔹 `/leaderboard` - View the XP leaderboard with navigation\n🔹 `/xp_table [start] [levels]` - View XP requirements for levels\n🔹 💬 Chat to gain XP automatically!",
+            name="🔧 Bot Management Commands", 
+            value="🔹 `/give_tokens <user> [quantity]` - Give pack tokens to user\n🔹 `/wipe_user <user>` - Wipe user's card data\n🔹 `/set_config <key> <value>` - Configure bot settings",
             inline=False
         )
-        
         embed.add_field(
-            name="ℹ️ Information Commands", 
-            value="🔹 `/help` - Show this help menu",
+            name="🛠️ System Commands", 
+            value="🔹 `/debug_bot` - System diagnostics and troubleshooting\n🔹 `/bot_stats` - View bot statistics\n🔹 `/reload_cards` - Reload card library\n🔹 `/list_config` - View all configuration settings",
             inline=False
         )
-        
+        embed.set_footer(text="🔐 Staff commands visible to Staff role only • Version 1.2.29")
+    else:
+        embed.set_footer(text="💡 Tip: Use interactive buttons for battles! • Version 1.2.29")
+    
+    return embed
+
+# The help text never changes, so both variants are built once
+HELP_EMBED = build_help_embed(False)
+STAFF_HELP_EMBED = build_help_embed(True)
+
+@bot.tree.command(name='help', description='Show all available commands')
+async def help_slash(interaction: discord.Interaction):
+    """Show all available commands"""
+    try:
         # Check if user has Staff role (admin access)
         is_staff = False
         if interaction.guild and hasattr(interaction.user, 'roles'):
-            user_roles = [role.name for role in interaction.user.roles]
-            if 'Staff' in user_roles:
-                is_staff = True
+            is_staff = any(role.name == 'Staff' for role in interaction.user.roles)
         
         # Server owner always has access
         if interaction.guild and interaction.guild.owner_id == interaction.user.id:
             is_staff = True
         
-        if is_staff:
-            embed.add_field(
-                name="🔧 Bot Management Commands", 
-                value="🔹 `/give_tokens <user> [quantity]` - Give pack tokens to user\n🔹 `/wipe_user <user>` - Wipe user's card data\n🔹 `/set_config <key> <value>` - Configure bot settings",
-                inline=False
-            )
-            embed.add_field(
-                name="🛠️ System Commands", 
-                value="🔹 `/debug_bot` - System diagnostics and troubleshooting\n🔹 `/bot_stats` - View bot statistics\n🔹 `/reload_cards` - Reload card library\n🔹 `/list_config` - View all configuration settings",
-                inline=False
-            )
-            embed.set_footer(text="🔐 Staff commands visible to Staff role only • Version 1.2.29")
-        else:
-            embed.set_footer(text="💡 Tip: Use interactive buttons for battles! • Version 1.2.29")
+        embed = STAFF_HELP_EMBED if is_staff else HELP_EMBED
         
         # Check if interaction has already been responded to
         if not interaction.response.is_done():
@@ -976,14 +1325,11 @@ async def bot_stats_slash(interaction: discord.Interaction):
     """View bot statistics - Staff only"""
     try:
         # Get pack system stats
-        pack_stats = pack_system.get_pack_system_stats()
+        pack_stats = await asyncio.to_thread(pack_system.get_pack_system_stats)
         
-        # Get user count
-        user_count_result = db_manager.fetch_one('SELECT COUNT(*) FROM users')
-        user_count = user_count_result[0] if user_count_result else 0
-        
-        # Get total XP
-        total_xp_result = db_manager.fetch_one('SELECT SUM(xp) FROM users')
+        # Get user count and total XP
+        user_count = await asyncio.to_thread(get_user_count)
+        total_xp_result = await asyncio.to_thread(db_manager.fetch_one, 'SELECT SUM(xp) FROM users')
         total_xp = total_xp_result[0] if total_xp_result and total_xp_result[0] else 0
         
         embed = discord.Embed(
@@ -1123,7 +1469,7 @@ async def list_config_slash(interaction: discord.Interaction):
 @app_commands.describe(card_name='Name of the card to test ability for')
 async def test_ability_slash(interaction: discord.Interaction, card_name: str):
     """Test a card ability - Staff only"""
-    if get_config('game_enabled') != 'True':
+    if not settings.game_enabled:
         await interaction.response.send_message("The card game is currently disabled.", ephemeral=True)
         return
     
@@ -1259,38 +1605,32 @@ async def fix_cards_slash(interaction: discord.Interaction):
                 inline=False
             )
             
+            card_rows = [(card['name'], card['element'], card['rarity'], card['attack'],
+                          card['health'], card['cost'], card['ability'], card['ascii'])
+                         for card in card_library.get_all_cards()]
+            insert_card_query = '''INSERT INTO cards (name, element, rarity, attack, health, cost, ability, ascii_art) 
+                                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)'''
+            
             # Safely handle foreign key constraints
             try:
-                # First, disable foreign key checks if possible
-                if db_manager.db_type == 'postgresql':
-                    # For PostgreSQL, we need to be more careful with foreign keys
-                    # Instead of deleting, let's add missing cards
-                    existing_cards = db_manager.fetch_all('SELECT name FROM cards')
-                    existing_card_names = {card[0] for card in existing_cards}
-                    
-                    # Add any missing cards
-                    for card in card_library.get_all_cards():
-                        if card['name'] not in existing_card_names:
-                            db_manager.execute_query('''INSERT INTO cards (name, element, rarity, attack, health, cost, ability, ascii_art) 
-                                                       VALUES (%s, %s, %s, %s, %s, %s, %s, %s)''',
-                                                    (card['name'], card['element'], card['rarity'], card['attack'], 
-                                                     card['health'], card['cost'], card['ability'], card['ascii']))
-                else:
-                    # For SQLite, temporarily disable foreign keys
-                    db_manager.execute_query('PRAGMA foreign_keys = OFF')
-                    
-                    # Clear existing cards and repopulate
-                    db_manager.execute_query('DELETE FROM cards')
+                with db_manager.connection() as conn:
+                    cursor = conn.cursor()
                     
-                    # Repopulate cards
-                    for card in card_library.get_all_cards():
-                        db_manager.execute_query('''INSERT INTO cards (name, element, rarity, attack, health, cost, ability, ascii_art) 
-                                                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
-                                                (card['name'], card['element'], card['rarity'], card['attack'], 
-                                                 card['health'], card['cost'], card['ability'], card['ascii']))
-                    
-                    # Re-enable foreign keys
-                    db_manager.execute_query('PRAGMA foreign_keys = ON')
+                    if db_manager.db_type == 'postgresql':
+                        # For PostgreSQL, we need to be more careful with foreign keys
+                        # Instead of deleting, let's add missing cards
+                        cursor.execute('SELECT name FROM cards')
+                        existing_card_names = {row[0] for row in cursor.fetchall()}
+                        cursor.executemany(db_manager.convert_query(insert_card_query),
+                                           [row for row in card_rows if row[0] not in existing_card_names])
+                    else:
+                        # foreign_keys is per connection and off by default; make sure it
+                        # is off on the pooled writer without switching it on afterwards
+                        cursor.execute('PRAGMA foreign_keys = OFF')
+                        
+                        # Clear existing cards and repopulate in one transaction
+                        cursor.execute('DELETE FROM cards')
+                        cursor.executemany(insert_card_query, card_rows)
                     
             except Exception as fix_error:
                 embed.add_field(
@@ -1304,22 +1644,13 @@ async def fix_cards_slash(interaction: discord.Interaction):
                 existing_card_names = {card[0] for card in existing_cards}
                 
                 added_count = 0
-                for card in card_library.get_all_cards():
-                    if card['name'] not in existing_card_names:
+                for row in card_rows:
+                    if row[0] not in existing_card_names:
                         try:
-                            if db_manager.db_type == 'postgresql':
-                                db_manager.execute_query('''INSERT INTO cards (name, element, rarity, attack, health, cost, ability, ascii_art) 
-                                                           VALUES (%s, %s, %s, %s, %s, %s, %s, %s)''',
-                                                        (card['name'], card['element'], card['rarity'], card['attack'], 
-                                                         card['health'], card['cost'], card['ability'], card['ascii']))
-                            else:
-                                db_manager.execute_query('''INSERT INTO cards (name, element, rarity, attack, health, cost, ability, ascii_art) 
-                                                           VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
-                                                        (card['name'], card['element'], card['rarity'], card['attack'], 
-                                                         card['health'], card['cost'], card['ability'], card['ascii']))
+                            db_manager.execute_query(insert_card_query, row)
                             added_count += 1
                         except Exception as add_error:
-                            print(f"Failed to add card {card['name']}: {add_error}")
+                            print(f"Failed to add card {row[0]}: {add_error}")
                 
                 if added_count > 0:
                     embed.add_field(
@@ -1441,7 +1772,7 @@ async def debug_collection_slash(interaction: discord.Interaction, user: discord
 @app_commands.describe(opponent='Player to challenge to a battle')
 async def challenge_slash(interaction: discord.Interaction, opponent: discord.Member):
     """Challenge another player to a card battle"""
-    if get_config('game_enabled') != 'True':
+    if not settings.game_enabled:
         await interaction.response.send_message("The card game is currently disabled.", ephemeral=True)
         return
     
@@ -1468,8 +1799,8 @@ async def challenge_slash(interaction: discord.Interaction, opponent: discord.Me
             return
         
         # Check if both players have cards
-        challenger_collection = card_manager.get_user_collection(interaction.user.id)
-        opponent_collection = card_manager.get_user_collection(opponent.id)
+        challenger_collection = await asyncio.to_thread(card_manager.get_user_collection, interaction.user.id)
+        opponent_collection = await asyncio.to_thread(card_manager.get_user_collection, opponent.id)
         
         if not challenger_collection:
             await interaction.response.send_message("❌ You need cards to battle! Use `/pack` to get cards first.", ephemeral=True)
@@ -1526,7 +1857,7 @@ async def challenge_slash(interaction: discord.Interaction, opponent: discord.Me
 @bot.tree.command(name='battle_select', description='Select a card for your current battle using interactive UI')
 async def battle_select_slash(interaction: discord.Interaction):
     """Select a card for your current battle using interactive UI"""
-    if get_config('game_enabled') != 'True':
+    if not settings.game_enabled:
         await interaction.response.send_message("The card game is currently disabled.", ephemeral=True)
         return
     
@@ -1545,7 +1876,7 @@ async def battle_select_slash(interaction: discord.Interaction):
             return
         
         # Get user's collection
-        user_collection = card_manager.get_user_collection(interaction.user.id)
+        user_collection = await asyncio.to_thread(card_manager.get_user_collection, interaction.user.id)
         
         if not user_collection:
             await interaction.response.send_message("❌ You don't have any cards! Use `/pack` to get cards first.", ephemeral=True)
@@ -1565,7 +1896,7 @@ async def battle_select_slash(interaction: discord.Interaction):
 @bot.tree.command(name='battle_attack', description='Attack your opponent in the current battle')
 async def battle_attack_slash(interaction: discord.Interaction):
     """Attack your opponent in the current battle"""
-    if get_config('game_enabled') != 'True':
+    if not settings.game_enabled:
         await interaction.response.send_message("The card game is currently disabled.", ephemeral=True)
         return
     
@@ -1658,10 +1989,10 @@ async def battle_attack_slash(interaction: discord.Interaction):
             # Award rewards to winner
             try:
                 # Award XP
-                update_user_xp(winner_id, 50)
+                await award_user_xp(winner_id, 50)
                 
                 # Award pack token
-                pack_system.add_pack_tokens(winner_id, 'standard', 1)
+                await asyncio.to_thread(pack_system.add_pack_tokens, winner_id, 'standard', 1)
                 
                 print(f"[BATTLE_ATTACK] Battle {battle.battle_id} completed. Winner: {winner_id}")
             except Exception as reward_error:
@@ -1693,7 +2024,7 @@ async def battle_attack_slash(interaction: discord.Interaction):
 @bot.tree.command(name='battle_status', description='View the current status of your battle')
 async def battle_status_slash(interaction: discord.Interaction):
     """View the current status of your battle"""
-    if get_config('game_enabled') != 'True':
+    if not settings.game_enabled:
         await interaction.response.send_message("The card game is currently disabled.", ephemeral=True)
         return
     
@@ -1813,7 +2144,7 @@ async def battle_status_slash(interaction: discord.Interaction):
 @bot.tree.command(name='battle_forfeit', description='Forfeit your current battle')
 async def battle_forfeit_slash(interaction: discord.Interaction):
     """Forfeit your current battle"""
-    if get_config('game_enabled') != 'True':
+    if not settings.game_enabled:
         await interaction.response.send_message("The card game is currently disabled.", ephemeral=True)
         return
     
@@ -1856,10 +2187,10 @@ async def battle_forfeit_slash(interaction: discord.Interaction):
         # Award rewards to opponent
         try:
             # Award XP (less for forfeit victory)
-            update_user_xp(opponent_id, 25)
+            await award_user_xp(opponent_id, 25)
             
             # Award pack token
-            pack_system.add_pack_tokens(opponent_id, 'standard', 1)
+            await asyncio.to_thread(pack_system.add_pack_tokens, opponent_id, 'standard', 1)
             
             print(f"[BATTLE_FORFEIT] Battle {battle.battle_id} forfeited by {interaction.user.id}. Winner: {opponent_id}")
         except Exception as reward_error:
@@ -1882,20 +2213,12 @@ async def battle_forfeit_slash(interaction: discord.Interaction):
         print(f"Battle forfeit error: {e}")
         await interaction.response.send_message("❌ Error forfeiting battle. Please try again.", ephemeral=True)
 
-# Flask web server for cloud hosting
-app = Flask(__name__)
-
-@app.route('/')
-def home():
-    return "VibeBot is running! 🤖"
+# Health check web server for cloud hosting, served from the bot's event loop
+async def home(request):
+    return web.Response(text="VibeBot is running! 🤖")
 
-@app.route('/health')
-def health():
-    return {"status": "healthy", "bot": "online"}
-
-def run_flask():
-    port = int(os.environ.get('PORT', 10000))
-    app.run(host='0.0.0.0', port=port, debug=False, use_reloader=False)
+async def health(request):
+    return web.json_response({"status": "healthy", "bot": "online"})
 
 if __name__ == '__main__':
     token = os.getenv('DISCORD_TOKEN')
@@ -1904,12 +2227,6 @@ if __name__ == '__main__':
     if not token:
         print("[MAIN] ❌ Please set the DISCORD_TOKEN environment variable")
     else:
-        # Start Flask server in a separate thread for cloud hosting
-        flask_thread = threading.Thread(target=run_flask)
-        flask_thread.daemon = True
-        flask_thread.start()
-        
-        print("[MAIN] Flask server started")
         print("[MAIN] Starting VibeBot with modular architecture...")
         print(f"[MAIN] Bot intents: {bot.intents}")
         print(f"[MAIN] Bot command prefix: {bot.command_prefix}")
@@ -1919,6 +2236,4 @@ if __name__ == '__main__':
             bot.run(token)
         except Exception as e:
             print(f"[MAIN] ❌ Bot error: {e}")
-            import traceback
             traceback.print_exc()
-            flask_thread.join()
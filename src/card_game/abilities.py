@@ -22,6 +22,21 @@ class AbilitySystem:
     def __init__(self):
         self.db = db_manager
         self._ability_registry = self._initialize_abilities()
+        self._effect_handlers = self._initialize_effect_handlers()
+    
+    def _initialize_effect_handlers(self) -> Dict[str, Any]:
+        """Map each effect type to a handler taking (value, caster_data, target_data)"""
+        return {
+            'damage': self._apply_damage,
+            'heal': self._apply_heal,
+            'damage_boost': lambda value, caster, target: self._apply_damage_boost(value, caster),
+            'shield': self._apply_shield,
+            'stun': lambda value, caster, target: self._apply_stun(value, target),
+            'dodge': lambda value, caster, target: self._apply_dodge_chance(value, caster),
+            'attack_boost': lambda value, caster, target: self._apply_attack_boost(value, caster),
+            'attack_debuff': lambda value, caster, target: self._apply_attack_debuff(value, target),
+            'damage_reduction': lambda value, caster, target: self._apply_damage_reduction(value, caster),
+        }
     
     def _initialize_abilities(self) -> Dict[str, AbilityEffect]:
         """Initialize all card abilities from the card library"""
@@ -130,26 +145,9 @@ class AbilitySystem:
     def _execute_effect(self, effect: AbilityEffect, caster_data: Dict[str, Any], 
                        target_data: Dict[str, Any] = None, battle_context: Dict[str, Any] = None) -> Dict[str, Any]:
         """Execute the actual effect logic"""
-        result = {}
-        
-        if effect.effect_type == 'damage':
-            result = self._apply_damage(effect.value, caster_data, target_data)
-        elif effect.effect_type == 'heal':
-            result = self._apply_heal(effect.value, caster_data, target_data)
-        elif effect.effect_type == 'damage_boost':
-            result = self._apply_damage_boost(effect.value, caster_data)
-        elif effect.effect_type == 'shield':
-            result = self._apply_shield(effect.value, caster_data, target_data)
-        elif effect.effect_type == 'stun':
-            result = self._apply_stun(effect.value, target_data)
-        elif effect.effect_type == 'dodge':
-            result = self._apply_dodge_chance(effect.value, caster_data)
-        elif effect.effect_type == 'attack_boost':
-            result = self._apply_attack_boost(effect.value, caster_data)
-        elif effect.effect_type == 'attack_debuff':
-            result = self._apply_attack_debuff(effect.value, target_data)
-        elif effect.effect_type == 'damage_reduction':
-            result = self._apply_damage_reduction(effect.value, caster_data)
+        handler = self._effect_handlers.get(effect.effect_type)
+        if handler:
+            result = handler(effect.value, caster_data, target_data)
         else:
             result = {'applied': False, 'message': f'Effect type {effect.effect_type} not implemented yet'}
         
@@ -154,9 +154,6 @@ class Battle:
         self.created_at = datetime.now()
         self.finished_at = None
         self.winner_id = None
-        
-        # Card library reference
-        self.card_library = CardLibrary()
     
     def add_card(self, player_id: int, card_data: Dict[str, Any]) -> bool:
         """Add a card for a player"""
@@ -464,11 +461,14 @@ class BattleManager:
                     VALUES (%s, %s, %s) RETURNING battle_id
                 ''', (player1_id, player2_id, BattleState.CARD_SELECTION.value))
             else:
-                self.db.execute_query('''
-                    INSERT INTO battles (player1_id, player2_id, state) 
-                    VALUES (?, ?, ?)
-                ''', (player1_id, player2_id, BattleState.CARD_SELECTION.value))
-                result = self.db.fetch_one('SELECT last_insert_rowid()')
+                # lastrowid is per connection, so read it from the inserting cursor
+                with self.db.connection() as conn:
+                    cursor = conn.cursor()
+                    cursor.execute('''
+                        INSERT INTO battles (player1_id, player2_id, state) 
+                        VALUES (?, ?, ?)
+                    ''', (player1_id, player2_id, BattleState.CARD_SELECTION.value))
+                    result = (cursor.lastrowid,)
             
             if not result:
                 return None
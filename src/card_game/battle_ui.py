@@ -2,6 +2,7 @@
 Battle UI Components
 Interactive Discord UI for card battles using buttons and views
 """
+import asyncio
 import discord
 from typing import Dict, Any, Optional
 from .battle_system import battle_manager
@@ -9,6 +10,9 @@ from .card_manager import card_manager
 from .card_library import CardLibrary
 from .pack_system import pack_system
 
+# Shared card library for element and rarity lookups while rendering
+card_library = CardLibrary()
+
 
 class ChallengeView(discord.ui.View):
     """Interactive challenge accept/reject interface"""
@@ -314,8 +318,6 @@ class CardSelectionView(discord.ui.View):
         end_idx = start_idx + self.cards_per_page
         page_cards = self.collection[start_idx:end_idx]
         
-        card_library = CardLibrary()
-        
         for i, card_data in enumerate(page_cards):
             card_id, name, element, rarity, attack, health, cost, ability, ascii_art, quantity = card_data
             
@@ -409,7 +411,6 @@ class CardSelectionView(discord.ui.View):
         battle_manager.save_battle(battle)
         
         # Create response
-        card_library = CardLibrary()
         element_info = card_library.elements[element]
         
         embed = discord.Embed(
@@ -536,8 +537,6 @@ class CardSelectionView(discord.ui.View):
         end_idx = start_idx + self.cards_per_page
         page_cards = self.collection[start_idx:end_idx]
         
-        card_library = CardLibrary()
-        
         for card_data in page_cards:
             card_id, name, element, rarity, attack, health, cost, ability, ascii_art, quantity = card_data
             element_info = card_library.elements[element]
@@ -650,10 +649,9 @@ class BattleView(discord.ui.View):
             
             # Award rewards
             try:
-                from ..database.connection import db_manager
-                from bot import update_user_xp
-                update_user_xp(winner_id, 50)
-                pack_system.add_pack_tokens(winner_id, 'standard', 1)
+                from bot import award_user_xp
+                await award_user_xp(winner_id, 50)
+                await asyncio.to_thread(pack_system.add_pack_tokens, winner_id, 'standard', 1)
             except Exception as e:
                 print(f"Error awarding battle rewards: {e}")
             
@@ -708,10 +706,9 @@ class BattleView(discord.ui.View):
         
         # Award rewards to opponent
         try:
-            from ..database.connection import db_manager
-            from bot import update_user_xp
-            update_user_xp(opponent_id, 25)
-            pack_system.add_pack_tokens(opponent_id, 'standard', 1)
+            from bot import award_user_xp
+            await award_user_xp(opponent_id, 25)
+            await asyncio.to_thread(pack_system.add_pack_tokens, opponent_id, 'standard', 1)
         except Exception as e:
             print(f"Error awarding forfeit rewards: {e}")
         
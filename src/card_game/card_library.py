@@ -30,6 +30,7 @@ class CardLibrary:
         
         # Initialize card library
         self._card_library = self._create_card_library()
+        self._cards_by_name = {card['name'].lower(): card for card in self._card_library}
     
     def get_all_cards(self) -> List[Dict[str, Any]]:
         """Get all cards in the library"""
@@ -41,10 +42,7 @@ class CardLibrary:
     
     def get_card_by_name(self, name: str) -> Dict[str, Any] | None:
         """Get a specific card by name"""
-        for card in self._card_library:
-            if card['name'].lower() == name.lower():
-                return card
-        return None
+        return self._cards_by_name.get(name.lower())
     
     def _create_card_library(self) -> List[Dict[str, Any]]:
         """Create the complete card library"""
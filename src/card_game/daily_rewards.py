@@ -2,9 +2,24 @@
 Daily Rewards System
 Handles daily pack token rewards with streak bonuses
 """
+import random
+import time
 from datetime import datetime, timedelta
 from src.database.connection import db_manager
-from src.card_game.pack_system import pack_system
+from src.database.models import DailyReward
+
+# Current local date, recomputed once it rolls over at midnight
+_today = None
+_today_expires = 0.0
+
+def _current_date():
+    """Return today's local date, cached until the next midnight"""
+    global _today, _today_expires
+    now = time.time()
+    if now >= _today_expires:
+        _today = datetime.fromtimestamp(now).date()
+        _today_expires = datetime.combine(_today + timedelta(days=1), datetime.min.time()).timestamp()
+    return _today
 
 
 class DailyRewards:
@@ -16,12 +31,13 @@ class DailyRewards:
     def get_daily_reward_data(self, user_id):
         """Get user's daily reward data"""
         try:
-            result = db_manager.fetch_one('SELECT * FROM daily_rewards WHERE user_id = ?', (user_id,))
+            result = db_manager.fetch_one('''SELECT last_claim_date, current_streak, total_claims, best_streak
+                                            FROM daily_rewards WHERE user_id = ?''', (user_id,))
             if not result:
                 # Create new daily reward record
                 db_manager.execute_query('INSERT INTO daily_rewards (user_id) VALUES (?)', (user_id,))
-                result = (user_id, None, 0, 0, 0)
-            return result
+                return DailyReward(user_id)
+            return DailyReward(user_id, *result)
         except Exception as e:
             print(f"Error getting daily reward data: {e}")
             return None
@@ -29,45 +45,59 @@ class DailyRewards:
     def claim_daily_reward(self, user_id):
         """Claim daily reward and return reward info"""
         try:
-            # Get current reward data
-            reward_data = self.get_daily_reward_data(user_id)
-            if not reward_data:
-                return None
-            
-            user_id, last_claim_date, current_streak, total_claims, best_streak = reward_data
-            today = datetime.now().date()
-            
-            # Check if already claimed today
-            if last_claim_date and str(last_claim_date) == str(today):
-                return {'already_claimed': True, 'streak': current_streak}
-            
-            # Calculate new streak
-            yesterday = today - timedelta(days=1)
-            if last_claim_date and str(last_claim_date) == str(yesterday):
-                # Continuing streak
-                new_streak = current_streak + 1
-            elif last_claim_date and str(last_claim_date) < str(yesterday):
-                # Streak broken, reset to 1
-                new_streak = 1
-            else:
-                # First claim or continuing from today
-                new_streak = current_streak + 1 if current_streak > 0 else 1
-            
-            # Update best streak
-            new_best_streak = max(best_streak, new_streak)
-            
-            # Generate rewards based on streak
-            rewards = self._generate_daily_rewards(new_streak)
-            
-            # Update database
-            db_manager.execute_query('''UPDATE daily_rewards 
-                                       SET last_claim_date = ?, current_streak = ?, total_claims = ?, best_streak = ? 
-                                       WHERE user_id = ?''',
-                                   (today, new_streak, total_claims + 1, new_best_streak, user_id))
-            
-            # Add pack tokens to user's inventory
-            if rewards['pack_tokens'] > 0:
-                pack_system.add_pack_tokens(user_id, 'standard', rewards['pack_tokens'])
+            # Reading, updating the streak and granting tokens share one transaction
+            with db_manager.connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute(db_manager.convert_query('''INSERT INTO daily_rewards (user_id) VALUES (?)
+                                                          ON CONFLICT (user_id) DO NOTHING'''), (user_id,))
+                cursor.execute(db_manager.convert_query('''SELECT last_claim_date, current_streak, total_claims, best_streak
+                                                          FROM daily_rewards WHERE user_id = ?'''), (user_id,))
+                reward_data = DailyReward(user_id, *cursor.fetchone())
+                
+                last_claim_date = reward_data.last_claim_date
+                current_streak = reward_data.current_streak
+                total_claims = reward_data.total_claims
+                best_streak = reward_data.best_streak
+                today = _current_date()
+                
+                # Check if already claimed today
+                if last_claim_date and str(last_claim_date) == str(today):
+                    return {'already_claimed': True, 'streak': current_streak}
+                
+                # Calculate new streak
+                yesterday = today - timedelta(days=1)
+                if last_claim_date and str(last_claim_date) == str(yesterday):
+                    # Continuing streak
+                    new_streak = current_streak + 1
+                elif last_claim_date and str(last_claim_date) < str(yesterday):
+                    # Streak broken, reset to 1
+                    new_streak = 1
+                else:
+                    # First claim or continuing from today
+                    new_streak = current_streak + 1 if current_streak > 0 else 1
+                
+                # Update best streak
+                new_best_streak = max(best_streak, new_streak)
+                
+                # Only one of several concurrent claims can match the claim count read above
+                cursor.execute(db_manager.convert_query('''UPDATE daily_rewards 
+                                                          SET last_claim_date = ?, current_streak = ?, total_claims = ?, best_streak = ? 
+                                                          WHERE user_id = ? AND total_claims = ?'''),
+                               (today, new_streak, total_claims + 1, new_best_streak, user_id, total_claims))
+                if cursor.rowcount == 0:
+                    return {'already_claimed': True, 'streak': new_streak}
+                
+                # Generate rewards based on streak
+                rewards = self._generate_daily_rewards(new_streak)
+                
+                # Add pack tokens to user's inventory
+                if rewards['pack_tokens'] > 0:
+                    cursor.execute(db_manager.convert_query('''INSERT INTO user_packs (user_id, pack_type, quantity)
+                                                              VALUES (?, 'standard', ?)
+                                                              ON CONFLICT (user_id, pack_type)
+                                                              DO UPDATE SET quantity = user_packs.quantity + excluded.quantity'''),
+                                   (user_id, rewards['pack_tokens']))
             
             return {
                 'already_claimed': False,
@@ -106,7 +136,6 @@ class DailyRewards:
             base_tokens = 1
             if streak >= 14:
                 # After 2 weeks, small chance for bonus token
-                import random
                 bonus_chance = min(streak, 30)  # Up to 30% chance
                 if random.randint(1, 100) <= bonus_chance:
                     base_tokens += 1
@@ -115,3 +144,7 @@ class DailyRewards:
             rewards['pack_tokens'] = base_tokens
         
         return rewards
+
+
+# Global daily rewards instance
+daily_rewards = DailyRewards()
@@ -3,12 +3,16 @@ Pack System
 Handles pack tokens, pack opening, and reward generation
 """
 import random
+import traceback
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 from ..database.connection import db_manager
 from .card_library import CardLibrary
 from .card_manager import CardManager
 
+# Dedicated generator for pack rolls
+_RNG = random.Random()
+
 
 class PackSystem:
     """Manages pack tokens and pack opening mechanics"""
@@ -17,6 +21,30 @@ class PackSystem:
         self.db = db_manager
         self.card_library = CardLibrary()
         self.card_manager = CardManager()
+        
+        # Cumulative drop rates and per-rarity card lists, built once for rolling
+        self._rarity_names = []
+        self._rarity_cdf = []
+        cumulative = 0
+        for rarity, info in self.card_library.rarities.items():
+            cumulative += info['drop_rate']
+            self._rarity_names.append(rarity)
+            self._rarity_cdf.append(cumulative)
+        if cumulative < 100:
+            # Rolls beyond the configured rates fall back to common
+            self._rarity_names.append('common')
+            self._rarity_cdf.append(100)
+        self._cards_by_rarity = {rarity: self.card_library.get_cards_by_rarity(rarity)
+                                 for rarity in self._rarity_names}
+    
+    def _roll_cards(self, count: int) -> List[Dict[str, Any]]:
+        """Pick random cards, weighting each rarity by drop rate"""
+        cards = []
+        for rarity in _RNG.choices(self._rarity_names, cum_weights=self._rarity_cdf, k=count):
+            rarity_cards = self._cards_by_rarity.get(rarity)
+            if rarity_cards:
+                cards.append(_RNG.choice(rarity_cards))
+        return cards
     
     def add_pack_tokens(self, user_id: int, pack_type: str = 'standard', quantity: int = 1) -> bool:
         """Add pack tokens to user's inventory"""
@@ -24,35 +52,17 @@ class PackSystem:
             print(f"[PACK_SYSTEM] Adding {quantity} tokens for user {user_id}, pack_type: {pack_type}")
             print(f"[PACK_SYSTEM] Database type: {self.db.db_type}")
             
-            if self.db.db_type == 'postgresql':
-                # Use ? placeholders - they get converted to %s automatically
-                self.db.execute_query('''INSERT INTO user_packs (user_id, pack_type, quantity) 
-                                         VALUES (?, ?, ?) 
-                                         ON CONFLICT (user_id, pack_type) 
-                                         DO UPDATE SET quantity = user_packs.quantity + ?''',
-                                      (user_id, pack_type, quantity, quantity))
-                print(f"[PACK_SYSTEM] PostgreSQL upsert executed")
-            else:
-                # SQLite approach
-                existing = self.db.fetch_one('SELECT quantity FROM user_packs WHERE user_id = ? AND pack_type = ?', 
-                                           (user_id, pack_type))
-                print(f"[PACK_SYSTEM] Existing tokens: {existing}")
-                
-                if existing:
-                    new_quantity = existing[0] + quantity
-                    self.db.execute_query('UPDATE user_packs SET quantity = ? WHERE user_id = ? AND pack_type = ?',
-                                         (new_quantity, user_id, pack_type))
-                    print(f"[PACK_SYSTEM] Updated tokens: {existing[0]} -> {new_quantity}")
-                else:
-                    self.db.execute_query('INSERT INTO user_packs (user_id, pack_type, quantity) VALUES (?, ?, ?)',
-                                         (user_id, pack_type, quantity))
-                    print(f"[PACK_SYSTEM] Inserted new tokens: {quantity}")
+            # Single upsert so concurrent adds and pack opens can't overwrite each other
+            self.db.execute_query('''INSERT INTO user_packs (user_id, pack_type, quantity)
+                                     VALUES (?, ?, ?)
+                                     ON CONFLICT (user_id, pack_type)
+                                     DO UPDATE SET quantity = user_packs.quantity + excluded.quantity''',
+                                  (user_id, pack_type, quantity))
             
             print(f"[PACK_SYSTEM] Token addition successful")
             return True
         except Exception as e:
             print(f"[PACK_SYSTEM] Error adding pack tokens: {e}")
-            import traceback
             traceback.print_exc()
             return False
     
@@ -89,45 +99,44 @@ class PackSystem:
     def open_pack(self, user_id: int, pack_type: str = 'standard', cards_per_pack: int = 3) -> Optional[List[Dict[str, Any]]]:
         """Open a pack and return the cards generated"""
         try:
-            # Check and consume pack token
-            if not self.consume_pack_token(user_id, pack_type):
-                return None
-            
-            # Generate cards for the pack
-            pack_cards = []
-            
-            for _ in range(cards_per_pack):
-                # Determine rarity based on drop rates
-                roll = random.randint(1, 100)
-                cumulative = 0
-                selected_rarity = 'common'
+            # Token, card lookups and collection updates share one transaction
+            with self.db.connection() as conn:
+                cursor = conn.cursor()
+                
+                # Consume one token; no row updated means no tokens left
+                cursor.execute(self.db.convert_query('''UPDATE user_packs SET quantity = quantity - 1
+                                                       WHERE user_id = ? AND pack_type = ? AND quantity > 0'''),
+                               (user_id, pack_type))
+                if cursor.rowcount == 0:
+                    return None
+                
+                # Generate cards for the pack
+                pack_cards = self._roll_cards(cards_per_pack)
+                
+                if not pack_cards:
+                    return pack_cards
                 
-                for rarity, info in self.card_library.rarities.items():
-                    cumulative += info['drop_rate']
-                    if roll <= cumulative:
-                        selected_rarity = rarity
-                        break
+                # Resolve all card IDs in one query
+                names = list({card['name'] for card in pack_cards})
+                placeholders = ', '.join('?' for _ in names)
+                cursor.execute(self.db.convert_query(f'SELECT name, card_id FROM cards WHERE name IN ({placeholders})'),
+                               names)
+                card_ids = dict(cursor.fetchall())
                 
-                # Get random card of selected rarity
-                rarity_cards = self.card_library.get_cards_by_rarity(selected_rarity)
-                if rarity_cards:
-                    selected_card = random.choice(rarity_cards)
-                    pack_cards.append(selected_card)
-                    
-                    # Add card to user's collection in database
-                    card_data = self.card_manager.get_card_by_name(selected_card['name'])
-                    if card_data:
-                        card_id = card_data[0]  # First column is card_id
-                        success = self.card_manager.add_card_to_collection(user_id, card_id, 1)
-                        if not success:
-                            print(f"[PACK_SYSTEM] Failed to add card {selected_card['name']} to collection for user {user_id}")
+                # Add cards to the user's collection
+                rows = []
+                for card in pack_cards:
+                    card_id = card_ids.get(card['name'])
+                    if card_id is None:
+                        print(f"[PACK_SYSTEM] Card {card['name']} not found in database! This card will not be added to collection.")
                     else:
-                        print(f"[PACK_SYSTEM] Card {selected_card['name']} not found in database! This card will not be added to collection.")
-                        print(f"[PACK_SYSTEM] Available cards in database:")
-                        # Debug: List first few cards in database
-                        debug_cards = self.db.fetch_all('SELECT name FROM cards LIMIT 10')
-                        for debug_card in debug_cards:
-                            print(f"[PACK_SYSTEM] - {debug_card[0]}")
+                        rows.append((user_id, card_id, 1))
+                
+                cursor.executemany(self.db.convert_query('''INSERT INTO user_cards (user_id, card_id, quantity)
+                                                           VALUES (?, ?, ?)
+                                                           ON CONFLICT (user_id, card_id)
+                                                           DO UPDATE SET quantity = user_cards.quantity + excluded.quantity'''),
+                                   rows)
             
             return pack_cards
             
@@ -162,27 +171,7 @@ class PackSystem:
     def simulate_pack_opening(self, pack_type: str = 'standard', cards_per_pack: int = 3) -> List[Dict[str, Any]]:
         """Simulate pack opening without consuming tokens or adding cards (for testing)"""
         try:
-            pack_cards = []
-            
-            for _ in range(cards_per_pack):
-                # Determine rarity based on drop rates
-                roll = random.randint(1, 100)
-                cumulative = 0
-                selected_rarity = 'common'
-                
-                for rarity, info in self.card_library.rarities.items():
-                    cumulative += info['drop_rate']
-                    if roll <= cumulative:
-                        selected_rarity = rarity
-                        break
-                
-                # Get random card of selected rarity
-                rarity_cards = self.card_library.get_cards_by_rarity(selected_rarity)
-                if rarity_cards:
-                    selected_card = random.choice(rarity_cards)
-                    pack_cards.append(selected_card)
-            
-            return pack_cards
+            return self._roll_cards(cards_per_pack)
             
         except Exception as e:
             print(f"Error simulating pack opening: {e}")
@@ -213,17 +202,11 @@ class PackSystem:
     def get_pack_system_stats(self) -> Dict[str, Any]:
         """Get overall pack system statistics"""
         try:
-            # Total tokens in circulation
-            total_tokens_result = self.db.fetch_one('SELECT SUM(quantity) FROM user_packs')
-            total_tokens = total_tokens_result[0] if total_tokens_result and total_tokens_result[0] else 0
-            
-            # Users with tokens
-            users_with_tokens_result = self.db.fetch_one('SELECT COUNT(DISTINCT user_id) FROM user_packs WHERE quantity > 0')
-            users_with_tokens = users_with_tokens_result[0] if users_with_tokens_result else 0
-            
-            # Total cards in all collections
-            total_cards_result = self.db.fetch_one('SELECT SUM(quantity) FROM user_cards')
-            total_cards = total_cards_result[0] if total_cards_result and total_cards_result[0] else 0
+            # Tokens in circulation, users with tokens and total collected cards in one round trip
+            result = self.db.fetch_one('''SELECT (SELECT SUM(quantity) FROM user_packs),
+                                                 (SELECT COUNT(DISTINCT user_id) FROM user_packs WHERE quantity > 0),
+                                                 (SELECT SUM(quantity) FROM user_cards)''')
+            total_tokens, users_with_tokens, total_cards = (value or 0 for value in result)
             
             return {
                 'total_tokens_in_circulation': total_tokens,
@@ -3,15 +3,32 @@ Database Connection Manager
 Handles PostgreSQL and SQLite connections with automatic fallback
 """
 import os
+import queue
 import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
 from typing import Optional, Union
 
 
+# Applied to every pooled SQLite connection when it is opened
+SQLITE_PRAGMAS = (
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA cache_size=-64000',
+    'PRAGMA mmap_size=268435456',
+    'PRAGMA busy_timeout=5000',
+)
+
+
 class DatabaseManager:
     """Manages database connections with automatic PostgreSQL/SQLite fallback"""
     
     def __init__(self):
         self.db_type = 'sqlite'
+        self.pool_size = max(1, int(os.getenv('DB_POOL_SIZE', '5')))
+        self._pool = None
+        self._pool_lock = threading.Lock()
         self._test_connection()
     
     def _test_connection(self):
@@ -58,46 +75,109 @@ class DatabaseManager:
             # Use local file for development
             return 'bot_data.db'
     
-    def get_connection(self):
-        """Get a database connection"""
+    def _get_pool(self):
+        """Lazily create the connection pool for the active database type"""
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = self._create_pool()
+        return self._pool
+    
+    def _create_pool(self):
+        """Open the pooled connections"""
         if self.db_type == 'postgresql':
-            import psycopg2
-            database_url = os.getenv('DATABASE_URL')
-            return psycopg2.connect(
-                database_url,
+            from psycopg2 import pool
+            self._pool_slots = threading.BoundedSemaphore(self.pool_size)
+            return pool.ThreadedConnectionPool(
+                min(2, self.pool_size),
+                self.pool_size,
+                os.getenv('DATABASE_URL'),
                 connect_timeout=10,
                 sslmode='require'
             )
+        
+        # SQLite allows a single writer, so keep one read-write connection
+        # and let reads share a set of read-only connections
+        writer = queue.Queue()
+        writer.put(self._open_sqlite_connection())
+        
+        readers = queue.Queue()
+        for _ in range(self.pool_size):
+            readers.put(self._open_sqlite_connection(readonly=True))
+        
+        return {'write': writer, 'read': readers}
+    
+    def _open_sqlite_connection(self, readonly: bool = False) -> sqlite3.Connection:
+        """Open a SQLite connection tuned for many small writes"""
+        db_path = self._get_sqlite_path()
+        
+        if readonly:
+            uri = f"{Path(db_path).absolute().as_uri()}?mode=ro"
+            conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
         else:
-            return sqlite3.connect(self._get_sqlite_path())
+            conn = sqlite3.connect(db_path, check_same_thread=False)
+            # journal_mode is persistent, so the writer sets it for everyone
+            conn.execute('PRAGMA journal_mode=WAL')
+        
+        for pragma in SQLITE_PRAGMAS:
+            conn.execute(pragma)
+        return conn
     
-    def execute_query(self, query: str, params: Optional[tuple] = None):
-        """Execute a database query with automatic parameter conversion"""
-        conn = self.get_connection()
+    @contextmanager
+    def connection(self, readonly: bool = False):
+        """Borrow a pooled connection; commits on success and rolls back on error"""
+        pool = self._get_pool()
+        
+        if self.db_type == 'postgresql':
+            # ThreadedConnectionPool raises instead of waiting when exhausted
+            self._pool_slots.acquire()
+            try:
+                conn = pool.getconn()
+            except Exception:
+                self._pool_slots.release()
+                raise
+        else:
+            pool = pool['read'] if readonly else pool['write']
+            conn = pool.get()
         
         try:
-            # Convert SQLite placeholders (?) to PostgreSQL placeholders (%s) if needed
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
             if self.db_type == 'postgresql':
-                converted_query = query.replace('?', '%s')
-            else:
-                converted_query = query
-            
-            cursor = conn.cursor()
-            
-            if params:
-                cursor.execute(converted_query, params)
+                pool.putconn(conn, close=bool(conn.closed))
+                self._pool_slots.release()
             else:
-                cursor.execute(converted_query)
-            
-            # Only try to fetch results for SELECT queries
-            query_type = query.strip().upper().split()[0]
-            if query_type == 'SELECT':
-                result = cursor.fetchone()
-                conn.commit()
-                return result
-            else:
-                # For INSERT, UPDATE, DELETE - just commit and return success
-                conn.commit()
+                pool.put(conn)
+    
+    def convert_query(self, query: str) -> str:
+        """Convert SQLite placeholders (?) to PostgreSQL placeholders (%s) if needed"""
+        if self.db_type == 'postgresql':
+            return query.replace('?', '%s')
+        return query
+    
+    def execute_query(self, query: str, params: Optional[tuple] = None):
+        """Execute a database query with automatic parameter conversion"""
+        converted_query = self.convert_query(query)
+        
+        try:
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                
+                if params:
+                    cursor.execute(converted_query, params)
+                else:
+                    cursor.execute(converted_query)
+                
+                # Only try to fetch results for SELECT queries
+                query_type = query.strip().upper().split()[0]
+                if query_type == 'SELECT':
+                    return cursor.fetchone()
+                
+                # For INSERT, UPDATE, DELETE - the connection commits on exit
                 return True
             
         except Exception as e:
@@ -105,76 +185,52 @@ class DatabaseManager:
             print(f"Query: {converted_query}")
             print(f"Params: {params}")
             raise
-        finally:
-            conn.close()
     
     def execute_many(self, query: str, params_list: list):
         """Execute a query with multiple parameter sets"""
-        conn = self.get_connection()
-        
         try:
-            # Convert SQLite placeholders (?) to PostgreSQL placeholders (%s) if needed
-            if self.db_type == 'postgresql':
-                converted_query = query.replace('?', '%s')
-            else:
-                converted_query = query
-            
-            cursor = conn.cursor()
-            cursor.executemany(converted_query, params_list)
-            conn.commit()
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                cursor.executemany(self.convert_query(query), params_list)
             
         except Exception as e:
             print(f"Database error: {e}")
             raise
-        finally:
-            conn.close()
     
     def fetch_all(self, query: str, params: Optional[tuple] = None) -> list:
         """Fetch all results from a query"""
-        conn = self.get_connection()
+        converted_query = self.convert_query(query)
         
         try:
-            # Convert SQLite placeholders (?) to PostgreSQL placeholders (%s) if needed
-            if self.db_type == 'postgresql':
-                converted_query = query.replace('?', '%s')
-            else:
-                converted_query = query
-            
-            cursor = conn.cursor()
-            
-            if params:
-                cursor.execute(converted_query, params)
-            else:
-                cursor.execute(converted_query)
-            
-            return cursor.fetchall()
+            with self.connection(readonly=True) as conn:
+                cursor = conn.cursor()
+                
+                if params:
+                    cursor.execute(converted_query, params)
+                else:
+                    cursor.execute(converted_query)
+                
+                return cursor.fetchall()
             
         except Exception as e:
             print(f"Database error: {e}")
             raise
-        finally:
-            conn.close()
     
     def fetch_one(self, query: str, params: Optional[tuple] = None):
         """Fetch one result from a query"""
-        conn = self.get_connection()
+        converted_query = self.convert_query(query)
         
         try:
-            # Convert SQLite placeholders (?) to PostgreSQL placeholders (%s) if needed
-            if self.db_type == 'postgresql':
-                converted_query = query.replace('?', '%s')
-            else:
-                converted_query = query
-            
-            cursor = conn.cursor()
-            
-            if params:
-                cursor.execute(converted_query, params)
-            else:
-                cursor.execute(converted_query)
-            
-            result = cursor.fetchone()
-            return result  # This will be None if no results, which is expected
+            with self.connection(readonly=True) as conn:
+                cursor = conn.cursor()
+                
+                if params:
+                    cursor.execute(converted_query, params)
+                else:
+                    cursor.execute(converted_query)
+                
+                result = cursor.fetchone()
+                return result  # This will be None if no results, which is expected
             
         except Exception as e:
             print(f"Database error in fetch_one: {e}")
@@ -182,8 +238,6 @@ class DatabaseManager:
             print(f"Params: {params}")
             # Don't raise the exception, return None instead for empty results
             return None
-        finally:
-            conn.close()
 
 
 # Global database manager instance
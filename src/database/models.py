@@ -13,7 +13,7 @@ class User:
     user_id: int
     xp: int = 0
     level: int = 1
-    last_message: Optional[datetime] = None
+    last_message: Optional[int] = None  # Unix timestamp of the last XP award
     total_messages: int = 0
     username: Optional[str] = None
     display_name: Optional[str] = None
@@ -68,6 +68,16 @@ class Config:
     value: str
 
 
+@dataclass
+class Settings:
+    """Typed configuration values read on hot paths"""
+    game_enabled: bool = False
+    xp_cooldown: int = 60
+    xp_per_message: int = 15
+    xp_channel_id: Optional[int] = None
+    level_up_message: str = 'Congratulations {user}! You reached level {level}!'
+
+
 @dataclass
 class GameData:
     """Legacy game data (for compatibility)"""
@@ -2,6 +2,8 @@
 Database Setup and Initialization
 Handles table creation, migrations, and initial data population
 """
+from datetime import datetime
+
 from .connection import db_manager
 from ..card_game.card_library import CardLibrary
 
@@ -25,32 +27,32 @@ class DatabaseSetup:
     
     def _create_tables(self):
         """Create all necessary database tables"""
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        
         try:
-            if self.db.db_type == 'postgresql':
-                self._create_postgresql_tables(cursor)
-            else:
-                self._create_sqlite_tables(cursor)
+            with self.db.connection() as conn:
+                cursor = conn.cursor()
+                
+                if self.db.db_type == 'postgresql':
+                    self._create_postgresql_tables(cursor)
+                else:
+                    self._create_sqlite_tables(cursor)
             
-            conn.commit()
             print("✅ Database tables created")
             
         except Exception as e:
             print(f"❌ Error creating tables: {e}")
             raise
-        finally:
-            conn.close()
     
     def _create_postgresql_tables(self, cursor):
         """Create PostgreSQL tables"""
         # Users table
         cursor.execute('''CREATE TABLE IF NOT EXISTS users
                          (user_id BIGINT PRIMARY KEY, xp INTEGER DEFAULT 0, level INTEGER DEFAULT 1, 
-                          last_message TIMESTAMP, total_messages INTEGER DEFAULT 0, 
+                          last_message BIGINT, total_messages INTEGER DEFAULT 0, 
                           username TEXT, display_name TEXT)''')
         
+        # Leaderboard ordering
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_users_xp ON users (xp DESC)')
+        
         # Config table
         cursor.execute('''CREATE TABLE IF NOT EXISTS config
                          (key TEXT PRIMARY KEY, value TEXT)''')
@@ -72,6 +74,7 @@ class DatabaseSetup:
                          (card_id SERIAL PRIMARY KEY, name TEXT NOT NULL, element TEXT NOT NULL,
                           rarity TEXT NOT NULL, attack INTEGER NOT NULL, health INTEGER NOT NULL,
                           cost INTEGER NOT NULL, ability TEXT, ascii_art TEXT NOT NULL)''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_cards_name ON cards (name)')
         
         cursor.execute('''CREATE TABLE IF NOT EXISTS user_cards
                          (user_id BIGINT NOT NULL, card_id INTEGER NOT NULL, quantity INTEGER DEFAULT 1,
@@ -99,9 +102,12 @@ class DatabaseSetup:
         # Users table
         cursor.execute('''CREATE TABLE IF NOT EXISTS users
                          (user_id INTEGER PRIMARY KEY, xp INTEGER DEFAULT 0, level INTEGER DEFAULT 1, 
-                          last_message TIMESTAMP, total_messages INTEGER DEFAULT 0, 
+                          last_message INTEGER, total_messages INTEGER DEFAULT 0, 
                           username TEXT, display_name TEXT)''')
         
+        # Leaderboard ordering
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_users_xp ON users (xp DESC)')
+        
         # Config table
         cursor.execute('''CREATE TABLE IF NOT EXISTS config
                          (key TEXT PRIMARY KEY, value TEXT)''')
@@ -123,6 +129,7 @@ class DatabaseSetup:
                          (card_id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, element TEXT NOT NULL,
                           rarity TEXT NOT NULL, attack INTEGER NOT NULL, health INTEGER NOT NULL,
                           cost INTEGER NOT NULL, ability TEXT, ascii_art TEXT NOT NULL)''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_cards_name ON cards (name)')
         
         cursor.execute('''CREATE TABLE IF NOT EXISTS user_cards
                          (user_id INTEGER NOT NULL, card_id INTEGER NOT NULL, quantity INTEGER DEFAULT 1,
@@ -147,32 +154,32 @@ class DatabaseSetup:
     
     def _run_migrations(self):
         """Run database migrations"""
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        
         try:
-            # Get current version
-            try:
-                cursor.execute('SELECT version FROM db_version ORDER BY version DESC LIMIT 1')
-                current_version = cursor.fetchone()
-                current_version = current_version[0] if current_version else 0
-            except:
-                current_version = 0
-            
-            # Run migrations based on database type
-            if self.db.db_type == 'postgresql':
-                self._run_postgresql_migrations(cursor, current_version)
-            else:
-                self._run_sqlite_migrations(cursor, current_version)
+            with self.db.connection() as conn:
+                cursor = conn.cursor()
+                
+                # Get current version
+                try:
+                    cursor.execute('SELECT version FROM db_version ORDER BY version DESC LIMIT 1')
+                    current_version = cursor.fetchone()
+                    current_version = current_version[0] if current_version else 0
+                except:
+                    current_version = 0
+                
+                # Run migrations based on database type
+                if self.db.db_type == 'postgresql':
+                    self._run_postgresql_migrations(cursor, current_version)
+                else:
+                    # SQLite autocommits DDL unless a transaction is already open,
+                    # so open one to apply every migration step atomically
+                    cursor.execute('BEGIN')
+                    self._run_sqlite_migrations(cursor, current_version)
             
-            conn.commit()
             print(f"✅ Database migrations complete (version {current_version})")
             
         except Exception as e:
             print(f"❌ Error running migrations: {e}")
             raise
-        finally:
-            conn.close()
     
     def _run_postgresql_migrations(self, cursor, current_version):
         """Run PostgreSQL-specific migrations"""
@@ -202,41 +209,42 @@ class DatabaseSetup:
                 print(f"Card migration note: {e}")
             
             cursor.execute('INSERT INTO db_version (version) VALUES (%s) ON CONFLICT (version) DO NOTHING', (3,))
+        
+        # Version 4 is SQLite-only (trigger-maintained row counts)
+        if current_version < 5:
+            # Migration 5: Store last_message as a Unix timestamp instead of TIMESTAMP
+            cursor.execute("""SELECT data_type FROM information_schema.columns
+                              WHERE table_name = 'users' AND column_name = 'last_message'""")
+            column = cursor.fetchone()
+            if column and column[0].startswith('timestamp'):
+                # Old values are the bot host's local time; recent ones matter most, so use its current offset
+                utc_offset = int(datetime.now().astimezone().utcoffset().total_seconds())
+                cursor.execute('''ALTER TABLE users ALTER COLUMN last_message TYPE BIGINT
+                                 USING (EXTRACT(EPOCH FROM last_message) - %s)::BIGINT''', (utc_offset,))
+            
+            cursor.execute('INSERT INTO db_version (version) VALUES (%s) ON CONFLICT (version) DO NOTHING', (5,))
     
     def _run_sqlite_migrations(self, cursor, current_version):
         """Run SQLite-specific migrations"""
-        if current_version < 1:
-            # Migration 1: Add adventure columns
-            try:
-                cursor.execute('ALTER TABLE game_data ADD COLUMN adventure_xp INTEGER DEFAULT 0')
-            except:
-                pass
-            try:
-                cursor.execute('ALTER TABLE game_data ADD COLUMN monsters_defeated INTEGER DEFAULT 0')
-            except:
-                pass
-            try:
-                cursor.execute('ALTER TABLE game_data ADD COLUMN last_daily_quest DATE')
-            except:
-                pass
-            try:
-                cursor.execute('ALTER TABLE game_data ADD COLUMN daily_quest_progress TEXT DEFAULT "{}"')
-            except:
-                pass
-            
-            cursor.execute('INSERT OR REPLACE INTO db_version (version) VALUES (1)')
-        
         if current_version < 2:
-            # Migration 2: Add user columns
-            try:
-                cursor.execute('ALTER TABLE users ADD COLUMN username TEXT')
-            except:
-                pass
-            try:
-                cursor.execute('ALTER TABLE users ADD COLUMN display_name TEXT')
-            except:
-                pass
+            # Migrations 1-2: Add adventure and user columns missing from older databases
+            cursor.execute('PRAGMA table_info(game_data)')
+            game_columns = {row[1] for row in cursor.fetchall()}
+            cursor.execute('PRAGMA table_info(users)')
+            user_columns = {row[1] for row in cursor.fetchall()}
+            
+            for column, definition in (('adventure_xp', 'INTEGER DEFAULT 0'),
+                                       ('monsters_defeated', 'INTEGER DEFAULT 0'),
+                                       ('last_daily_quest', 'DATE'),
+                                       ('daily_quest_progress', "TEXT DEFAULT '{}'")):
+                if column not in game_columns:
+                    cursor.execute(f'ALTER TABLE game_data ADD COLUMN {column} {definition}')
             
+            for column in ('username', 'display_name'):
+                if column not in user_columns:
+                    cursor.execute(f'ALTER TABLE users ADD COLUMN {column} TEXT')
+            
+            cursor.execute('INSERT OR REPLACE INTO db_version (version) VALUES (1)')
             cursor.execute('INSERT OR REPLACE INTO db_version (version) VALUES (2)')
         
         if current_version < 3:
@@ -251,6 +259,26 @@ class DatabaseSetup:
                 print(f"Card migration note: {e}")
             
             cursor.execute('INSERT OR REPLACE INTO db_version (version) VALUES (3)')
+        
+        if current_version < 4:
+            # Migration 4: Trigger-maintained row counts (COUNT(*) is a full scan in SQLite)
+            cursor.execute('''CREATE TABLE IF NOT EXISTS stats
+                             (name TEXT PRIMARY KEY, value INTEGER NOT NULL DEFAULT 0)''')
+            cursor.execute("INSERT OR REPLACE INTO stats (name, value) VALUES ('users', (SELECT COUNT(*) FROM users))")
+            cursor.execute('''CREATE TRIGGER IF NOT EXISTS users_count_insert AFTER INSERT ON users
+                             BEGIN UPDATE stats SET value = value + 1 WHERE name = 'users'; END''')
+            cursor.execute('''CREATE TRIGGER IF NOT EXISTS users_count_delete AFTER DELETE ON users
+                             BEGIN UPDATE stats SET value = value - 1 WHERE name = 'users'; END''')
+            
+            cursor.execute('INSERT OR REPLACE INTO db_version (version) VALUES (4)')
+        
+        if current_version < 5:
+            # Migration 5: Store last_message as a Unix timestamp instead of ISO text
+            # Old values are local datetime.now() strings, so convert them from local time
+            cursor.execute("""UPDATE users SET last_message = CAST(strftime('%s', last_message, 'utc') AS INTEGER)
+                              WHERE typeof(last_message) = 'text'""")
+            
+            cursor.execute('INSERT OR REPLACE INTO db_version (version) VALUES (5)')
     
     def _populate_initial_data(self):
         """Populate initial configuration data"""
@@ -270,24 +298,23 @@ class DatabaseSetup:
             'boss_encounter_chance': '3'
         }
         
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        
         try:
-            for key, value in default_config.items():
+            rows = list(default_config.items())
+            
+            with self.db.connection() as conn:
+                cursor = conn.cursor()
+                
                 if self.db.db_type == 'postgresql':
-                    cursor.execute('INSERT INTO config (key, value) VALUES (%s, %s) ON CONFLICT (key) DO NOTHING', (key, value))
+                    from psycopg2.extras import execute_values
+                    execute_values(cursor, 'INSERT INTO config (key, value) VALUES %s ON CONFLICT (key) DO NOTHING', rows)
                 else:
-                    cursor.execute('INSERT OR IGNORE INTO config (key, value) VALUES (?, ?)', (key, value))
+                    cursor.executemany('INSERT OR IGNORE INTO config (key, value) VALUES (?, ?)', rows)
             
-            conn.commit()
             print("✅ Default configuration populated")
             
         except Exception as e:
             print(f"❌ Error populating config: {e}")
             raise
-        finally:
-            conn.close()
     
     def _populate_card_library_postgresql(self, cursor):
         """Populate the cards table with the initial card library for PostgreSQL"""